@@ -1,18 +1,28 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
 from typing import List, Optional
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
 import uuid
 from datetime import datetime
 import httpx
 import re
 import json
 import asyncio
-from urllib.parse import urlparse
+import codecs
+import ipaddress
+import socket
+import time
+from collections import OrderedDict
+from html import unescape
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from selectolax.parser import HTMLParser
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -30,6 +40,79 @@ DB_NAME = os.environ.get('DB_NAME', 'neurodivergent_organizer')
 client = AsyncIOMotorClient(MONGO_URL)
 db = client[DB_NAME]
 collection = db.saved_content
+# One document per applied data migration, keyed by name
+migrations = db.migrations
+
+# Shared HTTP client for metadata fetches, created on startup
+HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build the pooled HTTP/2 client used for metadata fetches"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(connect=2.0, read=5.0, write=2.0, pool=1.0),
+        limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+        http2=True,
+        # Add user agent to avoid blocking
+        headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        },
+        # Redirects are followed by fetch_metadata_from_url so each hop is vetted
+        follow_redirects=False
+    )
+
+# Background metadata fetching: save_content enqueues, one worker starts a task
+# per item with at most METADATA_SEM fetches in flight
+METADATA_QUEUE: asyncio.Queue = asyncio.Queue()
+METADATA_SEM = asyncio.Semaphore(50)
+METADATA_TASKS = set()
+METADATA_WORKER: Optional[asyncio.Task] = None
+# Overall budget for one fetch; the client timeouts only bound each read
+METADATA_FETCH_DEADLINE = 15.0
+# How long shutdown waits for queued fetches before leaving them for the next start
+METADATA_DRAIN_TIMEOUT = 10.0
+
+@app.on_event("startup")
+async def startup():
+    global HTTP_CLIENT, METADATA_WORKER
+    HTTP_CLIENT = create_http_client()
+    METADATA_WORKER = asyncio.create_task(metadata_worker())
+    
+    await collection.create_indexes([
+        # Full-text index backing /api/search
+        IndexModel([
+            ("title", "text"),
+            ("description", "text"),
+            ("category", "text"),
+            ("tags", "text")
+        ]),
+        # Newest-first listing
+        IndexModel([("date_saved", -1)]),
+        # Point lookups for update/delete
+        IndexModel([("id", 1)], unique=True),
+        # Category/tag aggregations
+        IndexModel([("category", 1)]),
+        IndexModel([("tags", 1)]),
+        # Items still waiting on a metadata fetch
+        IndexModel([("metadata_pending", 1)], partialFilterExpression={"metadata_pending": True})
+    ])
+    
+    await migrate_legacy_tags()
+    
+    # Re-queue items whose metadata fetch was lost to a restart
+    async for doc in collection.find({"metadata_pending": True}, {"_id": 0, "id": 1, "url": 1}):
+        METADATA_QUEUE.put_nowait((doc["id"], doc["url"]))
+
+@app.on_event("shutdown")
+async def shutdown():
+    if METADATA_WORKER is not None:
+        # Anything still pending keeps metadata_pending and is re-queued on startup
+        try:
+            await asyncio.wait_for(METADATA_QUEUE.join(), timeout=METADATA_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            print("Metadata queue not drained before shutdown, leaving remaining items pending")
+        METADATA_WORKER.cancel()
+    if HTTP_CLIENT is not None:
+        await HTTP_CLIENT.aclose()
 
 # Pydantic models
 class ContentItem(BaseModel):
@@ -42,6 +125,7 @@ class ContentItem(BaseModel):
     category: Optional[str] = "General"
     date_saved: Optional[datetime] = None
     platform: Optional[str] = "Facebook"
+    metadata_pending: bool = False
 
 class ContentCreate(BaseModel):
     url: str
@@ -51,128 +135,347 @@ class ContentCreate(BaseModel):
 class SearchRequest(BaseModel):
     query: str
 
+# Validates a whole result list in one pydantic-core call
+ITEM_LIST_ADAPTER = TypeAdapter(List[ContentItem])
+
+def content_list_response(docs: List[dict]) -> Response:
+    """Validate raw documents once and serialize them straight to JSON"""
+    items = ITEM_LIST_ADAPTER.validate_python(docs)
+    return Response(ITEM_LIST_ADAPTER.dump_json(items), media_type="application/json")
+
+# Precompiled patterns for the regex fallback: one pass for the title,
+# one pass over all <meta> tags regardless of attribute order
+TITLE_RE = re.compile(r'<title[^>]*>([^<]+)</title>', re.IGNORECASE)
+META_TAG_RE = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+META_ATTR_RE = re.compile(r'([a-zA-Z_:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+def select_metadata(title: str, meta: dict) -> dict:
+    """Pick title, description and thumbnail from the parsed <meta> map"""
+    return {
+        "title": title,
+        "description": meta.get('description') or meta.get('og:description') or "",
+        "thumbnail": meta.get('og:image') or meta.get('twitter:image') or ""
+    }
+
+def add_meta(meta: dict, attrs: dict):
+    """Map meta name/property (lowercased) to content, keeping the first occurrence"""
+    key = attrs.get('property') or attrs.get('name')
+    content = attrs.get('content')
+    if key and content:
+        meta.setdefault(key.lower(), content.strip())
+
+def parse_metadata_regex(html: str) -> dict:
+    """Extract title, description and thumbnail with the fallback regex patterns"""
+    title_match = TITLE_RE.search(html)
+    # Decode entities so results match the selectolax path
+    title = unescape(title_match.group(1)).strip() if title_match else ""
+    
+    meta = {}
+    for tag in META_TAG_RE.finditer(html):
+        attrs = {
+            name.lower(): unescape(double or single)
+            for name, double, single in META_ATTR_RE.findall(tag.group(0))
+        }
+        add_meta(meta, attrs)
+    
+    return select_metadata(title, meta)
+
+def parse_metadata(html: str) -> dict:
+    """Extract title, description and thumbnail in a single HTML parse"""
+    try:
+        tree = HTMLParser(html)
+    except Exception as e:
+        print(f"Error parsing HTML, falling back to regex: {e}")
+        return parse_metadata_regex(html)
+    
+    title_node = tree.css_first('title')
+    title = title_node.text().strip() if title_node else ""
+    
+    meta = {}
+    for node in tree.css('meta'):
+        add_meta(meta, node.attributes)
+    
+    return select_metadata(title, meta)
+
+# Metadata lives in <head>; stop reading once it closes or the cap is hit
+MAX_HTML_BYTES = 256 * 1024
+HEAD_END_RE = re.compile(rb'</head', re.IGNORECASE)
+
+def decode_html(raw: bytes, charset: Optional[str]) -> str:
+    """Decode with the declared charset (utf-8 otherwise), skipping detection"""
+    try:
+        codec = codecs.lookup(charset or 'utf-8').name
+    except LookupError:
+        codec = 'utf-8'
+    return raw.decode(codec, errors='replace')
+
+async def read_html_head(response: httpx.Response) -> str:
+    """Read the body until </head> closes or MAX_HTML_BYTES is reached, then decode it"""
+    buf = bytearray()
+    async for chunk in response.aiter_bytes():
+        # Only search the new chunk, plus enough overlap to catch a split tag
+        start = max(0, len(buf) - 5)
+        buf.extend(chunk)
+        if HEAD_END_RE.search(buf, start) or len(buf) >= MAX_HTML_BYTES:
+            break
+    return decode_html(bytes(buf[:MAX_HTML_BYTES]), response.charset_encoding)
+
+# Returned when the page could not be fetched
+FAILED_METADATA = {
+    "title": "Unable to fetch title",
+    "description": "Unable to fetch description",
+    "thumbnail": ""
+}
+
+# LRU of successfully extracted metadata keyed by canonical URL
+METADATA_CACHE_SIZE = 4096
+METADATA_CACHE_TTL = 3600.0
+metadata_cache = OrderedDict()
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL for cache keys: lowercase scheme/host, sorted query, no fragment"""
+    parsed = urlparse(url.strip())
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((
+        parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or "/",
+        parsed.params, query, ""
+    ))
+
 async def extract_metadata_from_url(url: str) -> dict:
+    """Extract metadata from URL, reusing recent results for the same page"""
+    key = canonicalize_url(url)
+    entry = metadata_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        metadata_cache.move_to_end(key)
+        return dict(entry[1])
+    
+    metadata = await fetch_metadata_from_url(url)
+    if metadata != FAILED_METADATA:
+        metadata_cache[key] = (time.monotonic() + METADATA_CACHE_TTL, metadata)
+        metadata_cache.move_to_end(key)
+        if len(metadata_cache) > METADATA_CACHE_SIZE:
+            metadata_cache.popitem(last=False)
+    return dict(metadata)
+
+# Redirect hops followed per fetch, each one re-checked by is_public_http_url
+MAX_REDIRECTS = 5
+
+def is_public_address(address: str) -> bool:
+    """True for globally routable addresses, unwrapping IPv4-mapped IPv6"""
+    ip = ipaddress.ip_address(address.split('%')[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global
+
+async def is_public_http_url(url: str) -> bool:
+    """Only allow http(s) URLs whose host resolves to public addresses"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        return False
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(parsed.hostname, None)
+    except socket.gaierror:
+        return False
+    return bool(infos) and all(is_public_address(info[4][0]) for info in infos)
+
+async def fetch_metadata_from_url(url: str) -> dict:
     """Extract metadata from URL using simple HTTP request and HTML parsing"""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Add user agent to avoid blocking
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = await client.get(url, headers=headers, follow_redirects=True)
-            html = response.text
-            
-            # Extract title
-            title_match = re.search(r'<title[^>]*>([^<]+)</title>', html, re.IGNORECASE)
-            title = title_match.group(1).strip() if title_match else ""
-            
-            # Extract description from meta tags
-            desc_patterns = [
-                r'<meta\s+name=["\']description["\']\s+content=["\']([^"\']*)["\']',
-                r'<meta\s+property=["\']og:description["\']\s+content=["\']([^"\']*)["\']',
-                r'<meta\s+content=["\']([^"\']*)["\'][^>]*name=["\']description["\']'
-            ]
-            description = ""
-            for pattern in desc_patterns:
-                desc_match = re.search(pattern, html, re.IGNORECASE)
-                if desc_match:
-                    description = desc_match.group(1).strip()
-                    break
+        for _ in range(MAX_REDIRECTS + 1):
+            if not await is_public_http_url(url):
+                print(f"Refusing to fetch metadata for non-public URL: {url}")
+                return dict(FAILED_METADATA)
             
-            # Extract thumbnail from meta tags  
-            img_patterns = [
-                r'<meta\s+property=["\']og:image["\']\s+content=["\']([^"\']*)["\']',
-                r'<meta\s+name=["\']twitter:image["\']\s+content=["\']([^"\']*)["\']',
-                r'<meta\s+content=["\']([^"\']*)["\'][^>]*property=["\']og:image["\']'
-            ]
-            thumbnail = ""
-            for pattern in img_patterns:
-                img_match = re.search(pattern, html, re.IGNORECASE)
-                if img_match:
-                    thumbnail = img_match.group(1).strip()
-                    break
-            
-            return {
-                "title": title or "Untitled",
-                "description": description or "No description available",
-                "thumbnail": thumbnail or ""
-            }
-    except Exception as e:
-        print(f"Error extracting metadata: {e}")
+            async with HTTP_CLIENT.stream("GET", url) as response:
+                if response.has_redirect_location:
+                    url = str(response.url.join(response.headers["Location"]))
+                    continue
+                # Error pages (4xx/5xx, rate limits) are failures, not "Untitled" pages
+                if not response.is_success:
+                    print(f"HTTP {response.status_code} extracting metadata for {url}")
+                    return dict(FAILED_METADATA)
+                html = await read_html_head(response)
+                break
+        else:
+            print(f"Too many redirects extracting metadata for {url}")
+            return dict(FAILED_METADATA)
+        
+        metadata = parse_metadata(html)
+        
         return {
-            "title": "Unable to fetch title",
-            "description": "Unable to fetch description", 
-            "thumbnail": ""
+            "title": metadata["title"] or "Untitled",
+            "description": metadata["description"] or "No description available",
+            "thumbnail": metadata["thumbnail"] or ""
         }
+    except httpx.TimeoutException as e:
+        # ConnectTimeout / ReadTimeout / WriteTimeout / PoolTimeout
+        print(f"Timeout extracting metadata ({type(e).__name__}) for {url}")
+        return dict(FAILED_METADATA)
+    except Exception as e:
+        print(f"Error extracting metadata: {e}")
+        return dict(FAILED_METADATA)
+
+# Short-lived cache for the category/tag aggregations, cleared on writes
+AGGREGATION_CACHE_TTL = 30.0
+AGGREGATION_LIMIT = 200
+aggregation_cache = {}
+
+def get_cached_aggregation(key: str):
+    entry = aggregation_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+def set_cached_aggregation(key: str, value):
+    aggregation_cache[key] = (time.monotonic() + AGGREGATION_CACHE_TTL, value)
+
+def invalidate_aggregation_cache():
+    aggregation_cache.clear()
 
 @app.get("/api/health")
 async def health_check():
     return {"status": "ok", "service": "Neurodivergent Content Organizer"}
 
+def normalize_tags(tags: List[str]) -> List[str]:
+    """Lowercase, strip and dedupe tags so lookups can use exact matches"""
+    return list(dict.fromkeys(tag.strip().lower() for tag in tags if tag.strip()))
+
+async def migrate_legacy_tags():
+    """One-off: normalize tags saved before normalize_tags existed"""
+    if await migrations.find_one({"_id": "normalize_tags"}):
+        return
+    
+    # Compare in Python so anything normalize_tags would change is caught
+    # (non-ASCII case, duplicates, empty tags), not just what a regex can spot
+    updates = []
+    async for doc in collection.find({"tags": {"$exists": True}}, {"tags": 1}):
+        if not isinstance(doc["tags"], list):
+            continue
+        tags = normalize_tags(doc["tags"])
+        if tags != doc["tags"]:
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"tags": tags}}))
+    if updates:
+        await collection.bulk_write(updates)
+        print(f"Normalized tags on {len(updates)} legacy item(s)")
+    
+    await migrations.update_one(
+        {"_id": "normalize_tags"},
+        {"$set": {"applied_at": datetime.now()}},
+        upsert=True
+    )
+
+async def fetch_and_update(content_id: str, url: str):
+    """Fetch metadata for a saved item and fill in its placeholder fields"""
+    try:
+        metadata = await asyncio.wait_for(extract_metadata_from_url(url), METADATA_FETCH_DEADLINE)
+    except asyncio.TimeoutError:
+        print(f"Metadata fetch exceeded {METADATA_FETCH_DEADLINE}s for {url}")
+        metadata = dict(FAILED_METADATA)
+    await collection.update_one(
+        {"id": content_id},
+        {"$set": {**metadata, "metadata_pending": False}}
+    )
+
+async def run_metadata_job(content_id: str, url: str):
+    """Run one queued fetch, releasing its semaphore slot and queue entry"""
+    try:
+        await fetch_and_update(content_id, url)
+    except Exception as e:
+        print(f"Error updating metadata for {content_id}: {e}")
+        # Don't leave the item pending (and the UI polling) until the next restart
+        try:
+            await collection.update_one(
+                {"id": content_id},
+                {"$set": {**FAILED_METADATA, "metadata_pending": False}}
+            )
+        except Exception as clear_error:
+            print(f"Error clearing pending metadata for {content_id}: {clear_error}")
+    finally:
+        METADATA_SEM.release()
+        METADATA_QUEUE.task_done()
+
+async def metadata_worker():
+    """Start a task per queued fetch so one slow host never blocks the rest"""
+    while True:
+        content_id, url = await METADATA_QUEUE.get()
+        await METADATA_SEM.acquire()
+        task = asyncio.create_task(run_metadata_job(content_id, url))
+        METADATA_TASKS.add(task)
+        task.add_done_callback(METADATA_TASKS.discard)
+
 @app.post("/api/content", response_model=ContentItem)
 async def save_content(content: ContentCreate):
-    """Save a new content item with metadata extraction"""
-    
-    # Extract metadata from URL
-    metadata = await extract_metadata_from_url(content.url)
+    """Save a new content item; metadata is extracted in the background"""
     
-    # Create content item
+    # Create content item with placeholder metadata
     content_item = ContentItem(
         id=str(uuid.uuid4()),
         url=content.url,
-        title=metadata["title"],
-        description=metadata["description"],
-        thumbnail=metadata["thumbnail"],
-        tags=content.tags,
+        title=content.url,
+        description="Fetching description...",
+        thumbnail="",
+        tags=normalize_tags(content.tags),
         category=content.category,
         date_saved=datetime.now(),
-        platform="Facebook"  # Default for now
+        platform="Facebook",  # Default for now
+        metadata_pending=True
     )
     
     # Save to database
     doc = content_item.dict()
     await collection.insert_one(doc)
+    invalidate_aggregation_cache()
+    
+    # Extract metadata from URL in the background worker
+    METADATA_QUEUE.put_nowait((content_item.id, content.url))
     
     return content_item
 
-@app.get("/api/content", response_model=List[ContentItem])
-async def get_all_content():
-    """Get all saved content"""
-    cursor = collection.find({})
-    items = []
-    async for doc in cursor:
-        # Convert MongoDB _id to string and remove it
-        doc.pop('_id', None)
-        items.append(ContentItem(**doc))
-    
-    # Sort by date_saved, newest first
-    items.sort(key=lambda x: x.date_saved or datetime.min, reverse=True)
-    return items
-
-@app.post("/api/search", response_model=List[ContentItem])
+@app.get("/api/content", response_model=None, responses={200: {"model": List[ContentItem]}})
+async def get_all_content(skip: int = Query(0, ge=0), limit: int = Query(0, ge=0)):
+    """Get saved content, newest first (limit=0 returns everything)"""
+    cursor = collection.find({}, {"_id": 0}).sort("date_saved", -1).skip(skip).limit(limit)
+    return content_list_response(await cursor.to_list(length=None))
+
+@app.post("/api/search", response_model=None, responses={200: {"model": List[ContentItem]}})
 async def search_content(search_req: SearchRequest):
     """Search content by title, description, tags, or category"""
-    query = search_req.query.lower()
-    
-    # Create MongoDB text search query
-    search_filter = {
+    # Escape user input so it is matched literally (no ReDoS on the server)
+    safe_query = re.escape(search_req.query)
+    regex_filter = {
         "$or": [
-            {"title": {"$regex": query, "$options": "i"}},
-            {"description": {"$regex": query, "$options": "i"}},
-            {"tags": {"$in": [query]}},
-            {"category": {"$regex": query, "$options": "i"}}
+            {"title": {"$regex": safe_query, "$options": "i"}},
+            {"description": {"$regex": safe_query, "$options": "i"}},
+            {"tags": search_req.query.strip().lower()},
+            {"category": {"$regex": safe_query, "$options": "i"}}
         ]
     }
     
-    cursor = collection.find(search_filter)
-    items = []
-    async for doc in cursor:
-        doc.pop('_id', None)
-        items.append(ContentItem(**doc))
+    # Quote the query as one phrase so "-" and quotes are not read as $text operators
+    phrase = '"' + search_req.query.replace('"', ' ').strip() + '"'
     
-    # Sort by relevance (could be improved)
-    items.sort(key=lambda x: x.date_saved or datetime.min, reverse=True)
-    return items
+    # Whole-word hits from the text index come first, ranked by relevance
+    pipeline = [
+        {"$match": {"$text": {"$search": phrase}}},
+        {"$match": regex_filter},
+        {"$sort": {"score": {"$meta": "textScore"}}},
+        {"$project": {"_id": 0}}
+    ]
+    
+    ranked = []
+    try:
+        ranked = await collection.aggregate(pipeline).to_list(length=None)
+    except OperationFailure as e:
+        print(f"Text search unavailable, using substring matches only: {e}")
+    
+    # Then every other substring match (partial words like "face" in "Facebook"),
+    # newest first, so the result set is always exactly the substring matches
+    ranked_ids = [doc["id"] for doc in ranked]
+    rest_filter = {"$and": [regex_filter, {"id": {"$nin": ranked_ids}}]} if ranked_ids else regex_filter
+    cursor = collection.find(rest_filter, {"_id": 0}).sort("date_saved", -1)
+    docs = ranked + await cursor.to_list(length=None)
+    
+    return content_list_response(docs)
 
 @app.delete("/api/content/{content_id}")
 async def delete_content(content_id: str):
@@ -180,6 +483,7 @@ async def delete_content(content_id: str):
     result = await collection.delete_one({"id": content_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Content not found")
+    invalidate_aggregation_cache()
     return {"message": "Content deleted successfully"}
 
 @app.put("/api/content/{content_id}", response_model=ContentItem)
@@ -187,58 +491,63 @@ async def update_content(content_id: str, content: ContentCreate):
     """Update content tags and category"""
     
     update_data = {
-        "tags": content.tags,
+        "tags": normalize_tags(content.tags),
         "category": content.category
     }
     
-    result = await collection.update_one(
+    doc = await collection.find_one_and_update(
         {"id": content_id},
-        {"$set": update_data}
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.matched_count == 0:
+    if doc is None:
         raise HTTPException(status_code=404, detail="Content not found")
+    invalidate_aggregation_cache()
     
-    # Return updated item
-    doc = await collection.find_one({"id": content_id})
-    doc.pop('_id', None)
     return ContentItem(**doc)
 
 @app.get("/api/categories")
 async def get_categories():
     """Get all unique categories"""
+    cached = get_cached_aggregation("categories")
+    if cached is not None:
+        return cached
+    
     pipeline = [
+        {"$match": {"category": {"$nin": [None, ""]}}},  # Skip null categories
         {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
+        {"$sort": {"count": -1}},
+        {"$limit": AGGREGATION_LIMIT},
+        {"$project": {"_id": 0, "name": "$_id", "count": 1}}
     ]
     
-    categories = []
-    async for doc in collection.aggregate(pipeline):
-        if doc["_id"]:  # Skip null categories
-            categories.append({
-                "name": doc["_id"],
-                "count": doc["count"]
-            })
+    categories = await collection.aggregate(pipeline, allowDiskUse=False).to_list(length=None)
     
+    set_cached_aggregation("categories", categories)
     return categories
 
 @app.get("/api/tags")
 async def get_tags():
     """Get all unique tags"""
+    cached = get_cached_aggregation("tags")
+    if cached is not None:
+        return cached
+    
     pipeline = [
+        {"$match": {"tags": {"$exists": True, "$ne": []}}},
         {"$unwind": "$tags"},
+        {"$match": {"tags": {"$nin": [None, ""]}}},  # Skip empty tags
         {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
+        {"$sort": {"count": -1}},
+        {"$limit": AGGREGATION_LIMIT},
+        {"$project": {"_id": 0, "name": "$_id", "count": 1}}
     ]
     
-    tags = []
-    async for doc in collection.aggregate(pipeline):
-        if doc["_id"]:  # Skip empty tags
-            tags.append({
-                "name": doc["_id"],
-                "count": doc["count"]
-            })
+    tags = await collection.aggregate(pipeline, allowDiskUse=False).to_list(length=None)
     
+    set_cached_aggregation("tags", tags)
     return tags
 
 if __name__ == "__main__":
@@ -14,6 +14,7 @@ function App() {
   const [tags, setTags] = useState([]);
   const [selectedCategory, setSelectedCategory] = useState('all');
   const [showAddForm, setShowAddForm] = useState(false);
+  const [pendingPollErrors, setPendingPollErrors] = useState(0);
 
   // Predefined categories with colors
   const categoryColors = {
@@ -47,6 +48,26 @@ function App() {
     }
   };
 
+  // Metadata is fetched in the background after a save; pick it up once it lands
+  useEffect(() => {
+    if (!content.some(item => item.metadata_pending)) return;
+    const timer = setTimeout(refreshPendingContent, 2000);
+    return () => clearTimeout(timer);
+  }, [content, pendingPollErrors]);
+
+  const refreshPendingContent = async () => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/content`);
+      const data = await response.json();
+      const latest = new Map(data.map(item => [item.id, item]));
+      setContent(current => current.map(item => latest.get(item.id) || item));
+    } catch (error) {
+      console.error('Error refreshing content:', error);
+      // content is unchanged, so bump this to schedule the next poll anyway
+      setPendingPollErrors(count => count + 1);
+    }
+  };
+
   const loadCategories = async () => {
     try {
       const response = await fetch(`${API_BASE_URL}/api/categories`);
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The API lives in backend/server.py, which is run as a script rather than installed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
@@ -0,0 +1,14 @@
+import json
+from datetime import datetime
+
+from server import content_list_response
+
+
+def test_content_list_response_validates_and_serializes_once():
+    docs = [{"id": "1", "url": "https://example.com", "date_saved": datetime(2024, 1, 2, 3, 4), "score": 1.5}]
+    response = content_list_response(docs)
+    assert response.media_type == "application/json"
+    [item] = json.loads(response.body)
+    assert item["date_saved"] == "2024-01-02T03:04:00"
+    assert item["category"] == "General"
+    assert "score" not in item
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+import server
+from server import canonicalize_url
+
+
+def test_canonicalize_url_strips_fragment():
+    assert canonicalize_url("https://example.com/post#comments") == "https://example.com/post"
+
+
+def test_canonicalize_url_sorts_query():
+    assert canonicalize_url("https://example.com/p?b=2&a=1") == "https://example.com/p?a=1&b=2"
+
+
+def test_canonicalize_url_lowercases_scheme_and_host_only():
+    assert canonicalize_url("HTTPS://WWW.Example.COM/Path") == "https://www.example.com/Path"
+
+
+def test_canonicalize_url_adds_root_path():
+    assert canonicalize_url("https://example.com") == canonicalize_url("https://example.com/")
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Replace the network fetch, recording each URL actually fetched"""
+    calls = []
+
+    async def fake_fetch(url):
+        calls.append(url)
+        if "fail" in url:
+            return dict(server.FAILED_METADATA)
+        return {"title": url, "description": "", "thumbnail": ""}
+
+    now = [1000.0]
+    monkeypatch.setattr(server, "fetch_metadata_from_url", fake_fetch)
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(server, "metadata_cache", server.OrderedDict())
+    return calls, now
+
+
+def extract(url):
+    return asyncio.run(server.extract_metadata_from_url(url))
+
+
+def test_cache_hit_for_equivalent_url(fetches):
+    calls, _ = fetches
+    extract("https://example.com/p?b=2&a=1")
+    extract("https://EXAMPLE.com/p?a=1&b=2#top")
+    assert calls == ["https://example.com/p?b=2&a=1"]
+
+
+def test_cache_entry_expires_after_ttl(fetches):
+    calls, now = fetches
+    extract("https://example.com/")
+    now[0] += server.METADATA_CACHE_TTL + 1
+    extract("https://example.com/")
+    assert len(calls) == 2
+
+
+def test_failed_fetch_is_not_cached(fetches):
+    calls, _ = fetches
+    extract("https://example.com/fail")
+    extract("https://example.com/fail")
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entry_is_evicted(fetches, monkeypatch):
+    calls, _ = fetches
+    monkeypatch.setattr(server, "METADATA_CACHE_SIZE", 2)
+    extract("https://example.com/a")
+    extract("https://example.com/b")
+    extract("https://example.com/a")  # hit, makes b the oldest
+    extract("https://example.com/c")  # evicts b
+    extract("https://example.com/a")
+    extract("https://example.com/b")
+    assert calls == [
+        "https://example.com/a",
+        "https://example.com/b",
+        "https://example.com/c",
+        "https://example.com/b",
+    ]
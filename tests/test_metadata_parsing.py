@@ -0,0 +1,90 @@
+import pytest
+
+from server import decode_html, parse_metadata, parse_metadata_regex
+
+# Both parsers must agree, since the regex one is the fallback for selectolax
+PARSERS = [parse_metadata, parse_metadata_regex]
+
+
+@pytest.mark.parametrize("parse", PARSERS)
+def test_title_and_attribute_order(parse):
+    html = (
+        '<html><head><TITLE> Hello </TITLE>'
+        '<meta content="Reversed order" name="description">'
+        '<meta property="og:image" content="https://example.com/a.png">'
+        '</head></html>'
+    )
+    assert parse(html) == {
+        "title": "Hello",
+        "description": "Reversed order",
+        "thumbnail": "https://example.com/a.png",
+    }
+
+
+@pytest.mark.parametrize("parse", PARSERS)
+def test_single_and_double_quotes(parse):
+    html = (
+        "<head><meta name='description' content='Single \"quoted\"'>"
+        '<meta name="twitter:image" content="https://example.com/t.png"></head>'
+    )
+    metadata = parse(html)
+    assert metadata["description"] == 'Single "quoted"'
+    assert metadata["thumbnail"] == "https://example.com/t.png"
+
+
+@pytest.mark.parametrize("parse", PARSERS)
+def test_description_preferred_over_og_description(parse):
+    html = (
+        '<head><meta property="og:description" content="Open Graph">'
+        '<meta name="Description" content="Plain"></head>'
+    )
+    assert parse(html)["description"] == "Plain"
+
+
+@pytest.mark.parametrize("parse", PARSERS)
+def test_og_image_preferred_over_twitter_image(parse):
+    html = (
+        '<head><meta name="twitter:image" content="https://example.com/t.png">'
+        '<meta property="og:image" content="https://example.com/og.png"></head>'
+    )
+    assert parse(html)["thumbnail"] == "https://example.com/og.png"
+
+
+@pytest.mark.parametrize("parse", PARSERS)
+def test_missing_metadata_is_empty(parse):
+    assert parse("<html><body>No head</body></html>") == {
+        "title": "",
+        "description": "",
+        "thumbnail": "",
+    }
+
+
+def test_decode_html_uses_declared_charset():
+    assert decode_html("café".encode("latin-1"), "iso-8859-1") == "café"
+
+
+def test_decode_html_unknown_charset_falls_back_to_utf8():
+    assert decode_html("café".encode("utf-8"), "not-a-charset") == "café"
+
+
+def test_decode_html_replaces_invalid_bytes():
+    assert decode_html(b"ok\xff", None) == "ok�"
+
+
+@pytest.mark.parametrize("parse", PARSERS)
+@pytest.mark.parametrize("encoded, decoded", [
+    ("a &amp; b", "a & b"),
+    ("it&#39;s &quot;quoted&quot;", 'it\'s "quoted"'),
+    ("caf&eacute; &#x2014; menu", "café — menu"),
+])
+def test_html_entities_are_decoded(parse, encoded, decoded):
+    html = (
+        f'<head><title>{encoded}</title>'
+        f'<meta name="description" content="{encoded}">'
+        f'<meta property="og:image" content="https://example.com/?a=1&amp;b=2"></head>'
+    )
+    assert parse(html) == {
+        "title": decoded,
+        "description": decoded,
+        "thumbnail": "https://example.com/?a=1&b=2",
+    }
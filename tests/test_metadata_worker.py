@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+import server
+from server import FAILED_METADATA
+
+HANG = "https://slow.example.com/"
+
+
+class FakeCollection:
+    """Records update_one calls; find yields the given pending documents"""
+
+    def __init__(self, pending=(), fail_updates=0):
+        self.pending = list(pending)
+        self.fail_updates = fail_updates
+        self.updates = []
+
+    async def update_one(self, query, update):
+        if self.fail_updates:
+            self.fail_updates -= 1
+            raise RuntimeError("database unavailable")
+        self.updates.append((query["id"], update["$set"]))
+
+    async def create_indexes(self, indexes):
+        pass
+
+    def find(self, query, projection):
+        return self._iterate(self.pending if "metadata_pending" in query else [])
+
+    async def _iterate(self, docs):
+        for doc in docs:
+            yield doc
+
+
+@pytest.fixture
+def worker_env(monkeypatch):
+    """Fresh queue/semaphore per test, a fast deadline and a stubbed fetch"""
+    async def fake_extract(url):
+        if url == HANG:
+            await asyncio.sleep(60)
+        return {"title": url, "description": "", "thumbnail": ""}
+
+    collection = FakeCollection()
+    monkeypatch.setattr(server, "collection", collection)
+    monkeypatch.setattr(server, "extract_metadata_from_url", fake_extract)
+    monkeypatch.setattr(server, "METADATA_QUEUE", asyncio.Queue())
+    monkeypatch.setattr(server, "METADATA_SEM", asyncio.Semaphore(50))
+    monkeypatch.setattr(server, "METADATA_FETCH_DEADLINE", 0.2)
+    monkeypatch.setattr(server, "METADATA_DRAIN_TIMEOUT", 0.1)
+    monkeypatch.setattr(server, "METADATA_WORKER", None)
+    monkeypatch.setattr(server, "HTTP_CLIENT", None)
+    return collection
+
+
+async def drain(items):
+    worker = asyncio.create_task(server.metadata_worker())
+    for item in items:
+        server.METADATA_QUEUE.put_nowait(item)
+    try:
+        await asyncio.wait_for(server.METADATA_QUEUE.join(), timeout=2)
+    finally:
+        worker.cancel()
+
+
+def test_hanging_fetch_does_not_block_later_items(worker_env):
+    asyncio.run(drain([("slow", HANG), ("a", "https://a.example.com/"), ("b", "https://b.example.com/")]))
+    order = [content_id for content_id, _ in worker_env.updates]
+    assert order == ["a", "b", "slow"]
+    assert worker_env.updates[-1][1] == {**FAILED_METADATA, "metadata_pending": False}
+
+
+def test_semaphore_and_queue_accounting_return_to_idle(worker_env):
+    items = [(str(i), f"https://{i}.example.com/") for i in range(120)] + [("slow", HANG)]
+    asyncio.run(drain(items))
+    assert server.METADATA_SEM._value == 50
+    assert server.METADATA_QUEUE._unfinished_tasks == 0
+    assert len(worker_env.updates) == 121
+    assert all(update["metadata_pending"] is False for _, update in worker_env.updates)
+
+
+def test_failed_update_clears_pending_flag(worker_env):
+    worker_env.fail_updates = 1
+    asyncio.run(drain([("a", "https://a.example.com/")]))
+    assert worker_env.updates == [("a", {**FAILED_METADATA, "metadata_pending": False})]
+    assert server.METADATA_SEM._value == 50
+
+
+def test_startup_requeues_pending_items(worker_env, monkeypatch):
+    worker_env.pending = [{"id": "old", "url": "https://old.example.com/"}]
+
+    async def no_migration():
+        pass
+
+    monkeypatch.setattr(server, "migrate_legacy_tags", no_migration)
+
+    async def run():
+        await server.startup()
+        await asyncio.wait_for(server.METADATA_QUEUE.join(), timeout=2)
+        await server.shutdown()
+
+    asyncio.run(run())
+    assert [content_id for content_id, _ in worker_env.updates] == ["old"]
+
+
+def test_shutdown_waits_for_drain_then_leaves_stuck_items_pending(worker_env, monkeypatch):
+    monkeypatch.setattr(server, "METADATA_FETCH_DEADLINE", 60)
+
+    async def run():
+        server.METADATA_WORKER = asyncio.create_task(server.metadata_worker())
+        server.METADATA_QUEUE.put_nowait(("a", "https://a.example.com/"))
+        server.METADATA_QUEUE.put_nowait(("slow", HANG))
+        await asyncio.sleep(0.05)
+        await server.shutdown()
+        return server.METADATA_WORKER
+
+    worker = asyncio.run(run())
+    assert worker.cancelled()
+    # "slow" got no update, so it keeps metadata_pending and is re-queued next start
+    assert [content_id for content_id, _ in worker_env.updates] == ["a"]
@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+
+from server import MAX_HTML_BYTES, read_html_head
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Body delivered in the given chunks, recording how many were read"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+def read(chunks, charset="utf-8"):
+    stream = ChunkedStream(chunks)
+    response = httpx.Response(200, headers={"Content-Type": f"text/html; charset={charset}"}, stream=stream)
+    return asyncio.run(read_html_head(response)), stream.read
+
+
+def test_stops_at_head_split_across_chunks():
+    html, chunks_read = read([b"<html><head><title>x</title></HE", b"AD><body>", b"never read"])
+    assert html == "<html><head><title>x</title></HEAD><body>"
+    assert chunks_read == 2
+
+
+def test_stops_at_uppercase_head():
+    html, chunks_read = read([b"<HTML><HEAD></HEAD>", b"<BODY>"])
+    assert html == "<HTML><HEAD></HEAD>"
+    assert chunks_read == 1
+
+
+def test_body_without_head_is_trimmed_to_cap():
+    chunk = b"a" * (MAX_HTML_BYTES // 3 + 1)
+    html, chunks_read = read([chunk] * 5)
+    assert len(html) == MAX_HTML_BYTES
+    assert chunks_read == 3
+
+
+def test_decodes_with_response_charset():
+    html, _ = read(["<head><title>café</title></head>".encode("latin-1")], charset="iso-8859-1")
+    assert "café" in html
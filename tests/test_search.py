@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import pytest
+
+import server
+from server import SearchRequest
+
+FACE = {"id": "face", "url": "u1", "title": "My face"}
+FACEBOOK = {"id": "facebook", "url": "u2", "title": "Facebook post"}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class FakeCollection:
+    """Text index hits come from aggregate, substring matches from find"""
+
+    def __init__(self, text_hits, substring_hits):
+        self.text_hits = text_hits
+        self.substring_hits = substring_hits
+        self.find_filters = []
+
+    def aggregate(self, pipeline):
+        return FakeCursor(self.text_hits)
+
+    def find(self, query, projection):
+        self.find_filters.append(query)
+        excluded = query["$and"][1]["id"]["$nin"] if "$and" in query else []
+        return FakeCursor([doc for doc in self.substring_hits if doc["id"] not in excluded])
+
+
+def search(monkeypatch, collection, query="face"):
+    monkeypatch.setattr(server, "collection", collection)
+    response = asyncio.run(server.search_content(SearchRequest(query=query)))
+    return [item["id"] for item in json.loads(response.body)]
+
+
+def test_whole_word_hits_rank_before_other_substring_matches(monkeypatch):
+    collection = FakeCollection(text_hits=[FACE], substring_hits=[FACEBOOK, FACE])
+    assert search(monkeypatch, collection) == ["face", "facebook"]
+    assert collection.find_filters[0]["$and"][1] == {"id": {"$nin": ["face"]}}
+
+
+def test_substring_matches_returned_without_whole_word_hits(monkeypatch):
+    collection = FakeCollection(text_hits=[], substring_hits=[FACEBOOK])
+    assert search(monkeypatch, collection) == ["facebook"]
+
+
+def test_substring_scan_runs_even_when_text_index_matches(monkeypatch):
+    # Adding a whole-word "face" document must not hide the "Facebook" ones
+    with_face = FakeCollection(text_hits=[FACE], substring_hits=[FACEBOOK, FACE])
+    without_face = FakeCollection(text_hits=[], substring_hits=[FACEBOOK])
+    assert "facebook" in search(monkeypatch, with_face)
+    assert "facebook" in search(monkeypatch, without_face)
+
+
+@pytest.mark.parametrize("query", ["-face", 'say "hi"'])
+def test_text_operators_in_query_are_quoted(monkeypatch, query):
+    pipelines = []
+
+    class Recording(FakeCollection):
+        def aggregate(self, pipeline):
+            pipelines.append(pipeline)
+            return super().aggregate(pipeline)
+
+    search(monkeypatch, Recording([], []), query)
+    phrase = pipelines[0][0]["$match"]["$text"]["$search"]
+    assert phrase.startswith('"') and phrase.endswith('"')
+    assert '"' not in phrase[1:-1]
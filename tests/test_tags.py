@@ -0,0 +1,70 @@
+import asyncio
+
+import server
+from server import normalize_tags
+
+
+def test_normalize_tags_keeps_input_order():
+    assert normalize_tags(["test", "api"]) == ["test", "api"]
+
+
+def test_normalize_tags_lowercases_strips_and_dedupes():
+    assert normalize_tags([" Python", "tips", "PYTHON ", "", "  "]) == ["python", "tips"]
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+        self.writes = []
+        self.markers = {}
+
+    def find(self, query, projection):
+        return FakeCursor(self.docs)
+
+    async def bulk_write(self, updates):
+        self.writes.extend(updates)
+
+    async def find_one(self, query):
+        return self.markers.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.markers[query["_id"]] = update["$set"]
+
+
+def migrate(monkeypatch, docs, migrations=None):
+    collection = FakeCollection(docs)
+    migrations = migrations or FakeCollection()
+    monkeypatch.setattr(server, "collection", collection)
+    monkeypatch.setattr(server, "migrations", migrations)
+    asyncio.run(server.migrate_legacy_tags())
+    return {write._filter["_id"]: write._doc["$set"]["tags"] for write in collection.writes}, migrations
+
+
+def test_migration_normalizes_everything_normalize_tags_would_change(monkeypatch):
+    written, _ = migrate(monkeypatch, [
+        {"_id": 1, "tags": ["Écoles"]},
+        {"_id": 2, "tags": ["a", "a"]},
+        {"_id": 3, "tags": ["", "b"]},
+        {"_id": 4, "tags": [" Python "]},
+        {"_id": 5, "tags": ["already", "normal"]},
+    ])
+    assert written == {1: ["écoles"], 2: ["a"], 3: ["b"], 4: ["python"]}
+
+
+def test_migration_runs_once(monkeypatch):
+    _, migrations = migrate(monkeypatch, [{"_id": 1, "tags": ["A"]}])
+    assert "normalize_tags" in migrations.markers
+    written, _ = migrate(monkeypatch, [{"_id": 1, "tags": ["A"]}], migrations)
+    assert written == {}
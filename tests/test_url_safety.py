@@ -0,0 +1,90 @@
+import asyncio
+import socket
+
+import httpx
+import pytest
+
+import server
+from server import FAILED_METADATA, fetch_metadata_from_url, is_public_http_url
+
+PUBLIC_IP = "93.184.216.34"
+
+
+def check(url):
+    return asyncio.run(is_public_http_url(url))
+
+
+@pytest.mark.parametrize("url", [
+    "file:///etc/passwd",
+    "gopher://example.com/",
+    "http:///no-host",
+    "http://127.0.0.1/",
+    "http://localhost:27017/",
+    "http://10.0.0.5/",
+    "http://172.16.0.1/",
+    "http://192.168.1.1/",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/",
+    "http://[fe80::1]/",
+    "http://[::ffff:127.0.0.1]/",
+    "http://[::ffff:10.0.0.1]/",
+])
+def test_rejects_non_public_urls(url):
+    assert check(url) is False
+
+
+def test_accepts_public_address():
+    assert check(f"https://{PUBLIC_IP}/post") is True
+
+
+def test_resolves_hostnames(monkeypatch):
+    async def fake_getaddrinfo(self, host, port, *args, **kwargs):
+        addresses = {"public.test": PUBLIC_IP, "internal.test": "10.1.2.3"}
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (addresses[host], 0))]
+
+    monkeypatch.setattr(asyncio.base_events.BaseEventLoop, "getaddrinfo", fake_getaddrinfo)
+    assert check("https://public.test/") is True
+    assert check("https://internal.test/") is False
+
+
+@pytest.fixture
+def requests_made(monkeypatch):
+    """Serve canned responses for the public test IP, recording every request"""
+    seen = []
+
+    def handler(request):
+        seen.append(str(request.url))
+        routes = {
+            "/to-private": httpx.Response(302, headers={"Location": "http://169.254.169.254/latest"}),
+            "/to-public": httpx.Response(301, headers={"Location": "/page"}),
+            "/page": httpx.Response(200, html="<head><title>Public page</title></head>"),
+            "/limited": httpx.Response(429),
+        }
+        return routes[request.url.path]
+
+    async def run(url):
+        server.HTTP_CLIENT = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await fetch_metadata_from_url(url)
+        finally:
+            await server.HTTP_CLIENT.aclose()
+
+    monkeypatch.setattr(server, "HTTP_CLIENT", None)
+    return seen, lambda url: asyncio.run(run(url))
+
+
+def test_redirect_to_private_address_is_not_followed(requests_made):
+    seen, fetch = requests_made
+    assert fetch(f"http://{PUBLIC_IP}/to-private") == FAILED_METADATA
+    assert seen == [f"http://{PUBLIC_IP}/to-private"]
+
+
+def test_redirect_to_public_page_is_followed(requests_made):
+    seen, fetch = requests_made
+    assert fetch(f"http://{PUBLIC_IP}/to-public")["title"] == "Public page"
+    assert seen == [f"http://{PUBLIC_IP}/to-public", f"http://{PUBLIC_IP}/page"]
+
+
+def test_error_status_is_a_failed_fetch(requests_made):
+    _, fetch = requests_made
+    assert fetch(f"http://{PUBLIC_IP}/limited") == FAILED_METADATA